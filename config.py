@@ -15,8 +15,22 @@ class Config:
     # API配置
     API_TIMEOUT = 30
     MAX_RETRIES = 3
+    # HTTP连接池大小（每个主机保持的连接数）
+    HTTP_POOL_SIZE = 32
+    # 文章查询缓存：最多缓存的文章数和有效期（秒）
+    POST_CACHE_SIZE = 256
+    POST_CACHE_TTL = 60
     
     # 内容提取配置
+    # 单个页面最多读取的字节数，超出部分直接丢弃
+    MAX_CONTENT_BYTES = 5 * 1024 * 1024
+    # 提取结果缓存：最多缓存的条目数和有效期（秒）
+    EXTRACT_CACHE_SIZE = 256
+    EXTRACT_CACHE_TTL = 600
+    # HTTP响应缓存（SQLite），遵循ETag/Last-Modified等缓存头
+    HTTP_CACHE_NAME = 'url_extractor_cache'
+    HTTP_CACHE_EXPIRE = 3600
+    
     # 截断关键词：遇到这些关键词时停止复制后续内容
     TRUNCATION_KEYWORDS = [
         'Wrapping Up',
@@ -41,9 +55,15 @@ class Config:
         'Follow us'
     ]
     
+    # 配置验证通过后在整个进程内不再重复检查
+    _validated = False
+    
     @classmethod
     def validate_config(cls):
         """验证配置是否完整"""
+        if cls._validated:
+            return True
+        
         required_fields = [
             'WORDPRESS_URL',
             'WORDPRESS_USERNAME', 
@@ -58,4 +78,5 @@ class Config:
         if missing_fields:
             raise ValueError(f"缺少必要的配置项: {', '.join(missing_fields)}")
         
+        cls._validated = True
         return True
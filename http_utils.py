@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+
+
+def mount_pooled_adapter(session: requests.Session, config: Config) -> requests.Session:
+    """为会话挂载带连接池和重试的适配器，批量请求同一站点时复用连接"""
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_SIZE,
+        pool_maxsize=config.HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=config.MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class TTLCache:
+    """线程安全的内存缓存，条目超过有效期失效，超出容量时淘汰最久未使用的条目"""
+
+    __slots__ = ('maxsize', 'ttl', '_data', '_lock')
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (写入时间, 值)，按使用顺序排列
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """读取未过期的缓存值，命中时将其标记为最近使用；未命中返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """删除并返回缓存值（不检查有效期），不存在时返回None"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return None if entry is None else entry[1]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
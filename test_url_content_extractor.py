@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+URL内容提取器测试
+使用本地HTTP服务器验证响应体大小上限与HTTP缓存的配合
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import url_content_extractor
+from config import Config
+from url_content_extractor import URLContentExtractor, _create_session
+
+# 测试使用的响应体上限，以及超出上限的页面大小
+MAX_BYTES = 256 * 1024
+OVERSIZED_BYTES = 20 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+SMALL_PAGE = b'<html><head><title>Small</title></head><body><article>' + b'<p>Hello world, this is a small page.</p>' * 20 + b'</article></body></html>'
+
+# 压缩后很小、解压后远超上限的页面
+GZIP_PAGE = gzip.compress(b'<html><body><article>' + b'<p>' + b'x' * (OVERSIZED_BYTES + 10 * 1024 * 1024) + b'</p></article></body></html>')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    /big 返回超出上限的HTML页面，/small 返回可缓存的小页面，
+    /gzip 返回解压后超出上限的压缩页面，/chunked 以分块传输返回小页面
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if self.path == '/small':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(SMALL_PAGE)))
+            self.send_header('Cache-Control', 'max-age=3600')
+            self.end_headers()
+            self.wfile.write(SMALL_PAGE)
+            return
+
+        if self.path == '/gzip':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(GZIP_PAGE)))
+            self.send_header('Cache-Control', 'max-age=3600')
+            self.end_headers()
+            self.wfile.write(GZIP_PAGE)
+            return
+
+        if self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Cache-Control', 'max-age=3600')
+            self.end_headers()
+            for start in range(0, len(SMALL_PAGE), 256):
+                chunk = SMALL_PAGE[start:start + 256]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(OVERSIZED_BYTES))
+        self.end_headers()
+        chunk = b'<p>' + b'x' * (CHUNK_SIZE - 8) + b'</p>\n'
+        try:
+            for _ in range(OVERSIZED_BYTES // CHUNK_SIZE):
+                self.wfile.write(chunk)
+                server.bytes_sent += len(chunk)
+        except OSError:
+            # 客户端读到上限后关闭连接
+            pass
+        finally:
+            server.done.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _TestConfig(Config):
+    MAX_CONTENT_BYTES = MAX_BYTES
+
+
+class ContentLimitCacheTest(unittest.TestCase):
+    """HTTP缓存不能绕过MAX_CONTENT_BYTES读取整个响应体"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.requests = 0
+        self.server.bytes_sent = 0
+        self.server.done = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+        self.tmpdir = tempfile.mkdtemp()
+        config = _TestConfig()
+        config.HTTP_CACHE_NAME = os.path.join(self.tmpdir, 'cache')
+        self.cache_file = config.HTTP_CACHE_NAME + '.sqlite'
+
+        self.session = _create_session(config)
+        patcher = mock.patch.object(url_content_extractor, '_SESSION', self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.extractor = URLContentExtractor()
+        self.extractor.config = config
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_oversized_page_is_neither_downloaded_nor_cached(self):
+        self.extractor.extract_content(f'{self.base_url}/big')
+        self.assertTrue(self.server.done.wait(10))
+
+        # 关闭连接前内核缓冲区里可能已有数据，但远不会是整个页面
+        self.assertLess(self.server.bytes_sent, OVERSIZED_BYTES // 4)
+        if os.path.exists(self.cache_file):
+            self.assertLess(os.path.getsize(self.cache_file), MAX_BYTES)
+
+    def test_small_html_page_is_cached(self):
+        first = self.extractor.extract_content(f'{self.base_url}/small')
+        second = self.extractor.extract_content(f'{self.base_url}/small')
+
+        self.assertIsNotNone(first)
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_compressed_page_is_not_cached(self):
+        # Content-Length是压缩后的大小，不能据此判断解压后的体积
+        self.extractor.extract_content(f'{self.base_url}/gzip')
+        self.extractor.extract_content(f'{self.base_url}/gzip')
+
+        self.assertEqual(self.server.requests, 2)
+        if os.path.exists(self.cache_file):
+            self.assertLess(os.path.getsize(self.cache_file), MAX_BYTES)
+
+    def test_chunked_page_is_not_cached(self):
+        # 没有Content-Length的分块传输页面不写缓存，每次都重新请求
+        first = self.extractor.extract_content(f'{self.base_url}/chunked')
+        second = self.extractor.extract_content(f'{self.base_url}/chunked')
+
+        self.assertIsNotNone(first)
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
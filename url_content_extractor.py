@@ -6,69 +6,299 @@ URL内容提取器
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests_cache import CachedSession
+from bs4 import BeautifulSoup, NavigableString, CData, SoupStrainer, Tag
+from bs4.element import PreformattedString
+import soupsieve as sv
 import re
 from urllib.parse import urlparse
 import logging
-from typing import Optional, Dict, Any
-import time
+from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import asyncio
+from itertools import accumulate, chain
+from functools import lru_cache
+from bisect import bisect_right
 from config import Config
+from http_utils import TTLCache, mount_pooled_adapter
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 常见的内容选择器（按优先级排列）
+CONTENT_SELECTORS = (
+    'article',
+    '.post-content',
+    '.entry-content',
+    '.content',
+    '.article-content',
+    '.post-body',
+    '.story-body',
+    '.main-content',
+    '#content',
+    '#main-content',
+    '.text-content',
+    '.article-text',
+    '.post',
+    '.single-post',
+    '.blog-post',
+    '.page-content',
+    'main',
+    '[role="main"]',
+    '.container .content',
+    '.wrapper .content'
+)
+
+# 需要移除的元素
+REMOVE_SELECTORS = (
+    'script',
+    'style',
+    'nav',
+    'header',
+    'footer',
+    '.advertisement',
+    '.ads',
+    '.social-share',
+    '.comments',
+    '.related-posts',
+    '.sidebar',
+    '.navigation',
+    '.menu'
+)
+
+# 标题选择器（按优先级排列）
+TITLE_SELECTORS = (
+    'h1',
+    '.post-title',
+    '.entry-title',
+    '.article-title',
+    '.headline',
+    'title'
+)
+
+# 清理时保留的HTML标签
+ALLOWED_TAGS = frozenset((
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'strong', 'b', 'em', 'i', 'u',
+    'ul', 'ol', 'li', 'blockquote', 'div', 'span'
+))
+
+# 导入时预先合并、编译的选择器，所有实例共享，避免每次select时重新解析
+_CONTENT_JOINED = ', '.join(CONTENT_SELECTORS)
+_REMOVE_JOINED = ', '.join(REMOVE_SELECTORS)
+_COMPILED_CONTENT = tuple(sv.compile(selector) for selector in CONTENT_SELECTORS)
+_COMPILED_CONTENT_ANY = sv.compile(_CONTENT_JOINED)
+_COMPILED_REMOVE = sv.compile(_REMOVE_JOINED)
+_COMPILED_TITLE = tuple(sv.compile(selector) for selector in TITLE_SELECTORS)
+_COMPILED_TITLE_ANY = sv.compile(', '.join(TITLE_SELECTORS))
+
+# 作为HTML处理的Content-Type前缀
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml')
+
+# Content-Type响应头中声明的字符集
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# 截断修复：逐个扫描开始/结束标签（注释整体跳过），以及末尾被截断的不完整标签
+_TAG_TOKEN_RE = re.compile(r'<!--.*?-->|<(/?)([A-Za-z][A-Za-z0-9:-]*)\b[^<>]*?(/?)>', re.DOTALL)
+_PARTIAL_TAG_RE = re.compile(r'<(?:[/!A-Za-z][^<>]*)?$')
+
+# 没有结束标签的空元素
+VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+))
+
+# 模块加载时预编译的清理正则
+_MULTI_NL_RE = re.compile(r'\n\s*\n\s*\n+')  # 连续多个空行
+# 空段落/空列表：以字面量开头的正则只在前缀处尝试匹配，比str.replace更快，
+# 也不要与空行规则合并成分支结构（分支会使每个位置都要逐一尝试，慢一个数量级）
+_EMPTY_P_RE = re.compile(r'<p>\s*</p>')
+_EMPTY_UL_RE = re.compile(r'<ul>\s*</ul>')
+
+# 智能分段
+_NAME_ENTRY_SPLIT_RE = re.compile(r'(?=[A-Z][a-z]+[A-Z])')
+_NAME_ENTRY_START_RE = re.compile(r'^[A-Z][a-z]+[A-Z]')
+_NAME_AND_DESCRIPTION_RE = re.compile(r'^([A-Z][a-z]+)(.*)$')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+\s+')
+
+# 标准化名字列表（名字 Origin: xxx Meaning: xxx Popularity: xxx）
+_NAME_BLOCK_RE = re.compile(
+    r'([A-Z][a-z]+(?:[A-Z][a-z]+)*)\s*Origin:\s*([^M]+?)Meaning:\s*([^P]+?)Popularity:\s*([^A-Z]+?)(?=\s*[A-Z][a-z]+Origin:|$)',
+    re.MULTILINE | re.DOTALL
+)
+_ORIGIN_CLEAN_RE = re.compile(r'[^\w\s,.-]')
+_ITALIC_MARK_RE = re.compile(r'[*_]')
+_POPULARITY_CLEAN_RE = re.compile(r'[^\w\s#>]')
+_NAME_BEFORE_ORIGIN_RE = re.compile(r'([A-Z][a-z]+(?:[A-Z][a-z]+)*)\s*Origin:')
+_ORIGIN_FIELD_RE = re.compile(r'Origin:\s*([^M]*?)(?=Meaning:|$)')
+_MEANING_FIELD_RE = re.compile(r'Meaning:\s*([^P]*?)(?=Popularity:|$)')
+_POPULARITY_FIELD_RE = re.compile(r'Popularity:\s*([^A-Z]*?)(?=[A-Z][a-z]*Origin:|$)')
+
+# 标题标签
+HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+
+# 结构化内容中按文档顺序收集的块级元素
+BLOCK_TAGS = frozenset(('p', 'ul')) | HEADING_TAGS
+
+# twin names格式检测：分类标题标签及其关键词
+_TWIN_HEADING_TAGS = frozenset(('h2', 'h3'))
+TWIN_KEYWORDS = ('twin', 'match', 'rhyme', 'same letter', 'names that', 'girl names')
+
+# 块级元素被视为顶级内容时允许的父元素
+_TWIN_NAMES_PARENT_TAGS = frozenset(('div', 'body', '[document]', 'article', 'main', 'section'))
+_TRADITIONAL_PARENT_TAGS = frozenset(('div', 'body', '[document]'))
+
+# 启发式查找内容时考虑的容器标签
+HEURISTIC_CONTAINER_TAGS = frozenset(('div', 'section', 'main', 'article', 'aside'))
+
+# get_text()统计的字符串类型（不含注释、脚本、样式等）
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+# 序列化时不做实体转义的标签（与bs4默认formatter一致）
+_CDATA_CONTAINING_TAGS = frozenset(('script', 'style'))
+
+# 解析页面后立即删除的非内容标签（清理内容时本来也会移除）
+_SKIP_TAGS = frozenset(('script', 'style'))
+
+
+# 解析整页时只构建body和title，<head>中的脚本、样式等节点不会被创建
+PAGE_STRAINER = SoupStrainer(['body', 'title'])
+
+
+# HTML解析器：优先使用C实现的lxml，未安装时回退到纯Python的html.parser
+# 导入时确定一次，避免每次解析都先失败再回退
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+
+def _parse_html(markup, parse_only: SoupStrainer = None, from_encoding: str = None) -> BeautifulSoup:
+    """
+    解析HTML
+    
+    markup可以直接传入响应的原始字节，由lxml自行检测编码，省去一次解码；
+    已知编码时通过from_encoding传入，跳过编码探测
+    """
+    return BeautifulSoup(markup, PARSER, parse_only=parse_only, from_encoding=from_encoding)
+
+
+def _element_text(elem: Tag) -> str:
+    """
+    与elem.get_text()结果相同
+    
+    元素只包含单个文本节点时直接返回该节点，省去收集和拼接所有后代字符串
+    """
+    string = elem.string
+    if string is not None and type(string) in _TEXT_STRING_TYPES:
+        return string
+    return elem.get_text()
+
+
+def _top_level_blocks(start: Tag, parent_tags: frozenset) -> List[Tag]:
+    """
+    从start（含）开始按文档顺序收集顶级块级元素
+    
+    顶级块级元素指父元素属于parent_tags的BLOCK_TAGS元素；start之前的节点不会被遍历。
+    不用find_all_next(标签名列表)：按名字列表匹配要经过SoupStrainer，比名字集合判断慢得多
+    """
+    return [elem for elem in chain((start,), start.next_elements)
+            if elem.name in BLOCK_TAGS and elem.parent.name in parent_tags]
+
+
+@lru_cache(maxsize=1024)
+def _netloc(url: str) -> str:
+    """解析URL的域名部分，批量提取同一站点时命中缓存"""
+    return urlparse(url).netloc
+
+
+def _parse_fragment(markup) -> BeautifulSoup:
+    """
+    解析HTML片段
+    
+    lxml会为片段补全<html><body>，这里返回body，
+    使其子节点与html.parser解析出的顶级节点一致
+    """
+    soup = _parse_html(markup)
+    return soup.body or soup
+
+
+def _worker_limit(config: Config, max_workers: int) -> int:
+    """并发提取的数量上限：不超过连接池大小，避免线程等待空闲连接"""
+    return max(1, min(max_workers, config.HTTP_POOL_SIZE))
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _cache_filter(max_bytes: int):
+    """
+    生成HTTP缓存的响应过滤函数
+    
+    requests-cache写缓存时会先读取并解压整个响应体，这里只放行未压缩、声明了长度且不超过上限的HTML响应。
+    Content-Length是压缩后的大小，无法限制解压后的体积，所以压缩响应不写缓存；
+    分块传输（没有Content-Length）的页面同样不写缓存，每次都会重新请求。
+    不写缓存的响应保持流式读取，由_read_limited截断
+    """
+    def is_cacheable(response) -> bool:
+        content_type = response.headers.get('Content-Type', '').lower()
+        if not content_type.startswith(HTML_CONTENT_TYPES):
+            return False
+        if response.headers.get('Content-Encoding', 'identity').strip().lower() != 'identity':
+            return False
+        content_length = response.headers.get('Content-Length', '')
+        return content_length.isdigit() and int(content_length) <= max_bytes
+    return is_cacheable
+
+
+def _create_session(config: Config) -> CachedSession:
+    """创建带HTTP缓存、连接池和重试的会话"""
+    # 带HTTP缓存的会话：未变化的页面直接命中本地缓存或通过304重新验证
+    session = CachedSession(
+        config.HTTP_CACHE_NAME,
+        backend='sqlite',
+        expire_after=config.HTTP_CACHE_EXPIRE,
+        cache_control=True,
+        filter_fn=_cache_filter(config.MAX_CONTENT_BYTES)
+    )
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    # 配置连接池和重试，批量提取同一站点时复用连接
+    mount_pooled_adapter(session, config)
+    return session
+
+
+def _get_shared_session(config: Config) -> CachedSession:
+    """
+    获取模块级共享会话
+    
+    首次使用时才创建，避免导入模块时就打开缓存数据库
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = _create_session(config)
+        return _SESSION
+
 
 class URLContentExtractor:
     """URL内容提取器"""
     
+    # 选择器和允许的标签都是模块级常量，实例只持有配置、会话和提取缓存
+    __slots__ = ('config', 'session', '_cache')
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
         self.config = Config()
         
-        # 常见的内容选择器
-        self.content_selectors = [
-            'article',
-            '.post-content',
-            '.entry-content',
-            '.content',
-            '.article-content',
-            '.post-body',
-            '.story-body',
-            '.main-content',
-            '#content',
-            '#main-content',
-            '.text-content',
-            '.article-text',
-            '.post',
-            '.single-post',
-            '.blog-post',
-            '.page-content',
-            'main',
-            '[role="main"]',
-            '.container .content',
-            '.wrapper .content'
-        ]
+        # 所有实例共享同一个带缓存和连接池的会话，复用已建立的连接
+        self.session = _get_shared_session(self.config)
         
-        # 需要移除的元素
-        self.remove_selectors = [
-            'script',
-            'style',
-            'nav',
-            'header',
-            'footer',
-            '.advertisement',
-            '.ads',
-            '.social-share',
-            '.comments',
-            '.related-posts',
-            '.sidebar',
-            '.navigation',
-            '.menu'
-        ]
+        # 提取结果的TTL/LRU缓存：(url, start_keyword) -> 格式化内容
+        self._cache = TTLCache(self.config.EXTRACT_CACHE_SIZE, self.config.EXTRACT_CACHE_TTL)
     
     def extract_content(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -83,12 +313,26 @@ class URLContentExtractor:
         try:
             logger.info(f"正在提取URL内容: {url}")
             
-            # 发送请求
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            # 发送请求，流式读取响应体并限制大小
+            with self.session.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+                    logger.warning(f"URL返回的不是HTML内容: {url} ({content_type})")
+                    return None
+                
+                html = self._read_limited(response)
+            
+            # 解析HTML：响应头声明了字符集时直接使用，避免逐个尝试候选编码
+            charset_match = _CHARSET_RE.search(content_type)
+            soup = _parse_html(html, parse_only=PAGE_STRAINER,
+                               from_encoding=charset_match.group(1) if charset_match else None)
             
-            # 解析HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # 脚本和样式不属于正文：解析后立即删除，之后的查找、统计和清理都不再遍历它们。
+            # 用名字集合判断而不是soup(['script', 'style'])：按名字列表匹配要经过SoupStrainer，慢得多
+            for elem in [elem for elem in soup.descendants if elem.name in _SKIP_TAGS]:
+                elem.decompose()
             
             # 提取标题
             title = self._extract_title(soup)
@@ -107,7 +351,7 @@ class URLContentExtractor:
                 'url': url,
                 'title': title,
                 'content': cleaned_content,
-                'domain': urlparse(url).netloc
+                'domain': _netloc(url)
             }
             
         except requests.RequestException as e:
@@ -117,24 +361,36 @@ class URLContentExtractor:
             logger.error(f"提取内容时发生错误: {url} - {e}")
             return None
     
+    def _read_limited(self, response: requests.Response) -> bytes:
+        """分块读取响应体，超过MAX_CONTENT_BYTES时截断"""
+        max_bytes = self.config.MAX_CONTENT_BYTES
+        chunks = []
+        remaining = max_bytes
+        for chunk in response.iter_content(65536):
+            if len(chunk) > remaining:
+                # 只保留上限以内的部分，剩余内容不再下载
+                chunks.append(chunk[:remaining])
+                logger.warning(f"响应体超过 {max_bytes} 字节，已截断: {response.url}")
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        # 小页面通常一块即读完，无需再拼接复制
+        if len(chunks) == 1:
+            return chunks[0]
+        return b''.join(chunks)
+    
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """提取页面标题"""
-        # 尝试多种标题选择器
-        title_selectors = [
-            'h1',
-            '.post-title',
-            '.entry-title',
-            '.article-title',
-            '.headline',
-            'title'
-        ]
-        
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                title = title_elem.get_text(strip=True)
-                if title and len(title) > 5:  # 确保标题有意义
-                    return title
+        # 尝试多种标题选择器：与正文选择器相同，合并选择器只遍历一次文档，
+        # 再按优先级取每个选择器在文档顺序中的第一个匹配
+        matches = _COMPILED_TITLE_ANY.select(soup)
+        for selector in _COMPILED_TITLE:
+            for title_elem in matches:
+                if selector.match(title_elem):
+                    title = title_elem.get_text(strip=True)
+                    if title and len(title) > 5:  # 确保标题有意义
+                        return title
+                    break
         
         # 如果没有找到合适的标题，使用页面title
         title_elem = soup.find('title')
@@ -145,48 +401,69 @@ class URLContentExtractor:
     
     def _extract_main_content(self, soup: BeautifulSoup) -> Optional[BeautifulSoup]:
         """提取主要内容区域"""
-        # 首先尝试使用预定义的选择器
-        for selector in self.content_selectors:
-            content_elem = soup.select_one(selector)
-            if content_elem and self._is_valid_content(content_elem):
-                return content_elem
+        # 首先尝试使用预定义的选择器：合并选择器只遍历一次文档，
+        # 再按选择器优先级在匹配结果中取各自文档顺序的第一个元素
+        matches = _COMPILED_CONTENT_ANY.select(soup)
+        rejected = set()  # 同一元素常被多个选择器命中（如article/.post），只校验一次
+        for selector in _COMPILED_CONTENT:
+            for content_elem in matches:
+                if selector.match(content_elem):
+                    if id(content_elem) not in rejected:
+                        if self._is_valid_content(content_elem):
+                            return content_elem
+                        rejected.add(id(content_elem))
+                    break
         
         # 如果没有找到，使用启发式方法
         return self._find_content_heuristic(soup)
     
     def _is_valid_content(self, elem: BeautifulSoup) -> bool:
-        """检查元素是否包含有效内容"""
-        text = elem.get_text(strip=True)
-        return len(text) > 100  # 至少100个字符
+        """检查元素是否包含有效内容（至少100个字符）"""
+        # 逐段累加长度，达到阈值即返回，无需拼接出完整文本
+        total = 0
+        for text in elem.stripped_strings:
+            total += len(text)
+            if total > 100:
+                return True
+        return False
     
     def _find_content_heuristic(self, soup: BeautifulSoup) -> Optional[BeautifulSoup]:
         """使用启发式方法查找内容"""
         # 查找包含最多文本的容器元素
-        content_candidates = []
+        # 筛选与打分在同一次循环中完成，只保留当前最高分者，不构建候选列表
+        candidate_count = 0
+        best_tag = None
+        best_score = -1
+        best_density = None
+        best_paragraphs = 0
+        
+        # 一次自底向上遍历得到每个节点的文本长度、段落数和HTML长度
+        nodes, text_lengths, paragraph_counts, html_lengths = self._collect_node_stats(soup)
         
         # 扩大搜索范围，包括更多标签
-        for tag in soup.find_all(['div', 'section', 'main', 'article', 'aside']):
-            text = tag.get_text(strip=True)
-            if len(text) > 100:  # 降低最小字符要求
-                # 计算文本密度
-                html_length = len(str(tag))
-                text_density = len(text) / html_length if html_length > 0 else 0
-                
+        for tag in nodes:
+            if tag.name not in HEURISTIC_CONTAINER_TAGS:
+                continue
+            text_length = text_lengths.get(id(tag), 0)
+            if text_length > 100:  # 降低最小字符要求
                 # 降低文本密度要求，并考虑段落数量
-                paragraphs = tag.find_all('p')
-                paragraph_bonus = len(paragraphs) * 0.1  # 段落越多得分越高
+                paragraph_count = paragraph_counts.get(id(tag), 0)
+                paragraph_bonus = paragraph_count * 0.1  # 段落越多得分越高
+                
+                text_density = self._text_density(text_length, html_lengths[id(tag)])
+                if paragraph_count <= 3 and text_density <= 0.05:
+                    continue
                 
-                if text_density > 0.05 or len(paragraphs) > 3:  # 降低密度要求或有足够段落
-                    score = len(text) + paragraph_bonus * 100
-                    content_candidates.append((tag, score, text_density, len(paragraphs)))
+                score = text_length + paragraph_bonus * 100
+                candidate_count += 1
+                # 严格大于：并列时保留文档顺序中靠前的候选
+                if score > best_score:
+                    best_tag, best_score, best_density, best_paragraphs = tag, score, text_density, paragraph_count
         
-        if content_candidates:
-            # 按综合得分排序
-            content_candidates.sort(key=lambda x: x[1], reverse=True)
-            logger.info(f"找到 {len(content_candidates)} 个内容候选，选择得分最高的")
-            best_candidate = content_candidates[0]
-            logger.info(f"最佳候选：文本长度={int(best_candidate[1])}, 密度={best_candidate[2]:.3f}, 段落数={best_candidate[3]}")
-            return best_candidate[0]
+        if best_tag is not None:
+            logger.info(f"找到 {candidate_count} 个内容候选，选择得分最高的")
+            logger.info(f"最佳候选：文本长度={int(best_score)}, 密度={best_density:.3f}, 段落数={best_paragraphs}")
+            return best_tag
         
         # 如果还是没找到，尝试查找body下的主要内容
         logger.warning("启发式方法未找到合适内容，尝试使用body内容")
@@ -196,68 +473,97 @@ class URLContentExtractor:
         
         return None
     
+    def _collect_node_stats(self, soup: BeautifulSoup):
+        """
+        单次自底向上遍历，汇总每个节点的文本长度、后代段落数和HTML长度
+        
+        Returns:
+            (按文档顺序排列的所有后代节点, {id(节点): get_text(strip=True)的长度},
+             {id(节点): 后代<p>数量}, {id(节点): len(str(节点))})
+        """
+        nodes = list(soup.descendants)
+        text_lengths = {}
+        paragraph_counts = {}
+        html_lengths = {}
+        
+        # 逆文档顺序处理，保证子节点总是先于父节点汇总
+        for node in reversed(nodes):
+            parent_key = id(node.parent)
+            if node.name is None:  # 文本、注释等字符串节点
+                if type(node) in _TEXT_STRING_TYPES:
+                    length = len(node.strip())
+                    if length:
+                        text_lengths[parent_key] = text_lengths.get(parent_key, 0) + length
+                html_lengths[parent_key] = html_lengths.get(parent_key, 0) + self._string_markup_length(node)
+                continue
+            
+            key = id(node)
+            text_lengths[parent_key] = text_lengths.get(parent_key, 0) + text_lengths.get(key, 0)
+            paragraph_counts[parent_key] = (paragraph_counts.get(parent_key, 0) + paragraph_counts.get(key, 0)
+                                            + (node.name == 'p'))
+            # 此时html_lengths[key]只含子节点的长度，再加上自身的开始和结束标签
+            html_length = html_lengths.get(key, 0) + self._tag_markup_length(node)
+            html_lengths[key] = html_length
+            html_lengths[parent_key] = html_lengths.get(parent_key, 0) + html_length
+        
+        return nodes, text_lengths, paragraph_counts, html_lengths
+    
+    def _string_markup_length(self, node: NavigableString) -> int:
+        """字符串节点序列化后的长度，按转义规则直接计数，不生成转义后的字符串"""
+        if isinstance(node, PreformattedString):  # 注释、CDATA等只加前后缀
+            return len(node.PREFIX) + len(node) + len(node.SUFFIX)
+        if node.parent is not None and node.parent.name in _CDATA_CONTAINING_TAGS:
+            return len(node)
+        # & -> &amp;  < -> &lt;  > -> &gt;
+        return len(node) + 4 * node.count('&') + 3 * (node.count('<') + node.count('>'))
+    
+    def _tag_markup_length(self, tag: Tag) -> int:
+        """标签自身（开始标签+结束标签，不含子节点）序列化后的长度"""
+        if not tag.contents:
+            return len(str(tag))
+        if not tag.attrs and not tag.prefix:
+            return 2 * len(tag.name) + 5  # <name></name>
+        # 用不含子节点的同名同属性空标签计算，避免序列化整个子树
+        shell = Tag(name=tag.name, prefix=tag.prefix, attrs=tag.attrs, can_be_empty_element=False)
+        return len(str(shell))
+    
+    def _text_density(self, text_length: int, html_length: int) -> float:
+        """计算文本密度：文本长度 / HTML长度"""
+        return text_length / html_length if html_length > 0 else 0
+    
     def _clean_content(self, content_elem: BeautifulSoup) -> str:
-        """清理内容，保留格式"""
-        # 创建内容副本以避免修改原始内容
-        content_copy = BeautifulSoup(str(content_elem), 'html.parser')
+        """
+        清理内容，保留格式
         
-        # 移除不需要的元素
-        for selector in self.remove_selectors:
-            for elem in content_copy.select(selector):
-                elem.decompose()
+        注意：content_elem会被直接移入独立文档并就地修改，调用后原文档中不再包含它
+        """
+        # 将内容子树整体移入空文档，既不序列化重新解析，也不复制节点
+        content_doc = _parse_html('')
+        content_doc.append(content_elem.extract())
+        
+        # 移除不需要的元素（合并选择器，单次遍历）
+        for elem in _COMPILED_REMOVE.select(content_doc):
+            elem.decompose()
         
         # 检查是否是新的minimalistmama格式（HTML已经结构化）
-        if self._is_structured_html_format(content_copy):
+        if self._is_structured_html_format(content_doc):
             logger.info("检测到结构化HTML格式，直接保留HTML结构")
-            return self._clean_structured_html(content_copy)
-        
-        # 保留重要的HTML标签
-        allowed_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'strong', 'b', 'em', 'i', 'u', 'ul', 'ol', 'li', 'blockquote', 'div', 'span']
+            return self._clean_structured_html(content_doc)
         
         # 直接保留HTML结构，只清理不需要的标签
-        def clean_element(elem):
-            """递归清理元素，保留允许的标签结构"""
-            if elem.name is None:  # 文本节点
-                return str(elem)
-            
-            if elem.name in allowed_tags:
-                # 保留允许的标签
-                cleaned_children = []
-                for child in elem.children:
-                    cleaned_child = clean_element(child)
-                    if cleaned_child and cleaned_child.strip():
-                        cleaned_children.append(cleaned_child)
-                
-                if cleaned_children or elem.name in ['br']:  # br标签即使没有子元素也保留
-                    children_html = ''.join(cleaned_children)
-                    if elem.name == 'br':
-                        return '<br>'
-                    elif children_html.strip():
-                        return f"<{elem.name}>{children_html}</{elem.name}>"
-                return ""
-            else:
-                # 不允许的标签，提取其内容
-                cleaned_children = []
-                for child in elem.children:
-                    cleaned_child = clean_element(child)
-                    if cleaned_child and cleaned_child.strip():
-                        cleaned_children.append(cleaned_child)
-                return ''.join(cleaned_children)
-        
-        # 清理整个内容
         cleaned_parts = []
-        for child in content_copy.children:
-            cleaned_child = clean_element(child)
-            if cleaned_child and cleaned_child.strip():
+        for child in content_doc.children:
+            cleaned_child = self._clean_element(child)
+            if cleaned_child:
                 cleaned_parts.append(cleaned_child.strip())
         
         # 如果没有提取到内容，尝试备用方法
         if not cleaned_parts:
             logger.warning("标准清理方法没有提取到内容，尝试直接提取段落")
-            for elem in content_copy.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            for elem in content_doc.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
                 text = elem.get_text(strip=True)
                 if text and len(text) > 20:
-                    if elem.name.startswith('h'):
+                    if elem.name in HEADING_TAGS:
                         cleaned_parts.append(f"<{elem.name}>{text}</{elem.name}>")
                     else:
                         # 对于长文本，尝试智能分段
@@ -267,13 +573,83 @@ class URLContentExtractor:
         # 合并所有清理后的内容
         cleaned_html = '\n\n'.join(cleaned_parts)
         
-        # 进一步清理
-        cleaned_html = re.sub(r'<p>\s*</p>', '', cleaned_html)  # 移除空段落
-        cleaned_html = re.sub(r'<([^>]+)>\s*</\1>', '', cleaned_html)  # 移除其他空标签
-        cleaned_html = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned_html)  # 规范化换行
+        # 进一步清理（clean_element不会产生空标签，只需规范化换行）
+        cleaned_html = _MULTI_NL_RE.sub('\n\n', cleaned_html)  # 规范化换行
         
         return cleaned_html.strip()
     
+    def _clean_element(self, elem, strip_text: bool = False, format_spacing: bool = False) -> str:
+        """
+        单次前序遍历清理元素，保留允许的标签结构
+        
+        以显式栈模拟start/end事件：允许的标签在start时写入开始标签，
+        end时若没有任何子内容则撤回开始标签，因此不会产生空标签；
+        不允许的标签只展开其子元素。
+        
+        Args:
+            elem: 要清理的节点
+            strip_text: 是否去掉文本节点首尾空白（结构化内容使用）
+            format_spacing: 是否在写入文本时补充空格，
+                如 </span>English -> </span> English、<strong>Origin</strong>:English -> ...: English
+        """
+        out = []
+        stack = [(elem, None)]
+        while stack:
+            node, mark = stack.pop()
+            
+            if mark is not None:  # end事件
+                if len(out) == mark + 1:
+                    out.pop()
+                else:
+                    out.append(f"</{node.name}>")
+                continue
+            
+            if node.name is None:  # 文本节点
+                text = str(node)
+                if strip_text:
+                    text = text.strip()
+                    if not text:
+                        continue
+                elif not text.strip():
+                    continue
+                if format_spacing and out:
+                    text = self._space_after_tag(out, text)
+                out.append(text)
+                continue
+            
+            if node.name == 'br':  # br标签即使没有子元素也保留
+                out.append('<br>')
+                continue
+            
+            if node.name in ALLOWED_TAGS:
+                stack.append((node, len(out)))
+                out.append(f"<{node.name}>")
+            
+            # 子元素逆序入栈，保证按文档顺序弹出
+            stack.extend((child, None) for child in reversed(node.contents))
+        
+        return ''.join(out)
+    
+    def _space_after_tag(self, out: List[str], text: str) -> str:
+        """为紧跟在标签后面的文本补充空格，改善结构化内容的可读性"""
+        # 取已写入内容的末尾几个字符，冒号可能是单独的文本片段
+        tail = out[-1]
+        if len(tail) < 8 and len(out) > 1:
+            tail = out[-2] + tail
+        
+        first = text[0]
+        if not (first.isascii() and first.isalpha()):
+            # 标签后直接跟着冒号和文字时，在冒号后添加空格，例如: >:English -> >: English
+            if first == ':' and tail.endswith('>') and len(text) > 1 and text[1].isascii() and text[1].isalpha():
+                return ': ' + text[1:]
+            return text
+        
+        # 在span标签后面直接跟着文本内容时添加空格，例如: </span>English -> </span> English
+        # 冒号单独成段时同样处理: >: + English -> >: English
+        if tail.endswith('</span>') or tail.endswith('>:'):
+            return ' ' + text
+        return text
+    
     def _is_structured_html_format(self, soup: BeautifulSoup) -> bool:
         """
         检查是否是新的结构化HTML格式（如minimalistmama.co）
@@ -282,50 +658,51 @@ class URLContentExtractor:
         2. 新的twin names格式：使用<h2>/<h3>分类标题，<ul><li>包含名字对的列表
         """
         try:
-            # 检查传统的名字详情格式
-            strong_names = soup.select('p strong')
+            # 单次遍历同时统计两种格式的特征，任一格式满足条件即提前返回
+            strong_names = 0  # 位于<p>内的<strong>
             origin_count = 0
             meaning_count = 0
+            matching_headings = 0  # 包含twin names关键词的h2/h3标题
+            name_pairs_count = 0  # 包含名字对（通常包含 + 或 & 符号）的列表项
             
-            for span in soup.find_all('span'):
-                span_text = span.get_text().strip()
-                if 'Origin' in span_text:
-                    origin_count += 1
-                elif 'Meaning' in span_text:
-                    meaning_count += 1
-            
-            # 传统格式检测
-            if len(strong_names) >= 3 and (origin_count >= 3 or meaning_count >= 3):
-                logger.info(f"检测到传统结构化HTML格式：{len(strong_names)} 个名字，{origin_count} 个起源，{meaning_count} 个含义")
-                return True
-            
-            # 检查新的twin names格式
-            h2_headings = soup.find_all('h2')
-            h3_headings = soup.find_all('h3') 
-            ul_lists = soup.find_all('ul')
-            
-            # 检查是否包含twin names相关的标题和列表结构
-            twin_keywords = ['twin', 'match', 'rhyme', 'same letter', 'names that', 'girl names']
-            matching_headings = 0
-            
-            for heading in h2_headings + h3_headings:
-                heading_text = heading.get_text().lower()
-                if any(keyword in heading_text for keyword in twin_keywords):
+            for elem in soup.descendants:
+                name = elem.name
+                if name == 'strong':
+                    if elem.find_parent('p') is None:
+                        continue
+                    strong_names += 1
+                elif name == 'span':
+                    span_text = _element_text(elem).strip()
+                    if 'Origin' in span_text:
+                        origin_count += 1
+                    elif 'Meaning' in span_text:
+                        meaning_count += 1
+                    else:
+                        continue
+                elif name in _TWIN_HEADING_TAGS:
+                    heading_text = _element_text(elem).lower()
+                    if not any(keyword in heading_text for keyword in TWIN_KEYWORDS):
+                        continue
                     matching_headings += 1
-            
-            # 检查列表中是否包含名字对（通常包含 + 或 & 符号）
-            name_pairs_count = 0
-            for ul in ul_lists:
-                for li in ul.find_all('li'):
-                    li_text = li.get_text()
-                    if '+' in li_text or '&' in li_text:
-                        name_pairs_count += 1
-            
-            # 如果有相关标题和名字对列表，认为是新的twin names格式
-            if matching_headings >= 2 and name_pairs_count >= 5:
-                logger.info(f"检测到新的twin names结构化HTML格式：{matching_headings} 个相关标题，{name_pairs_count} 个名字对")
-                return True
+                elif name == 'li':
+                    li_text = _element_text(elem)
+                    if '+' not in li_text and '&' not in li_text:
+                        continue
+                    # 与逐个<ul>查找<li>的计数一致：嵌套列表中的项按所在<ul>层数计数
+                    name_pairs_count += sum(1 for parent in elem.parents if parent.name == 'ul')
+                else:
+                    continue
+                
+                # 传统格式：名字在<p><strong>中，详情在<span>标签中
+                if strong_names >= 3 and (origin_count >= 3 or meaning_count >= 3):
+                    logger.info(f"检测到传统结构化HTML格式：{strong_names} 个名字，{origin_count} 个起源，{meaning_count} 个含义")
+                    return True
                 
+                # 如果有相关标题和名字对列表，认为是新的twin names格式
+                if matching_headings >= 2 and name_pairs_count >= 5:
+                    logger.info(f"检测到新的twin names结构化HTML格式：{matching_headings} 个相关标题，{name_pairs_count} 个名字对")
+                    return True
+            
             return False
             
         except Exception as e:
@@ -356,17 +733,20 @@ class URLContentExtractor:
     def _is_twin_names_format(self, soup: BeautifulSoup) -> bool:
         """检查是否是twin names格式"""
         try:
-            # 检查是否有名字对列表结构
-            ul_lists = soup.find_all('ul')
+            # 检查是否有名字对列表结构：单次遍历统计，达到阈值即提前返回
             name_pairs_count = 0
             
-            for ul in ul_lists:
-                for li in ul.find_all('li'):
-                    li_text = li.get_text()
-                    if '+' in li_text or '&' in li_text:
-                        name_pairs_count += 1
+            for elem in soup.descendants:
+                if elem.name != 'li':
+                    continue
+                li_text = _element_text(elem)
+                if '+' in li_text or '&' in li_text:
+                    # 与逐个<ul>查找<li>的计数一致：嵌套列表中的项按所在<ul>层数计数
+                    name_pairs_count += sum(1 for parent in elem.parents if parent.name == 'ul')
+                    if name_pairs_count >= 5:
+                        return True
             
-            return name_pairs_count >= 5
+            return False
             
         except Exception as e:
             logger.error(f"检测twin names格式时发生错误: {e}")
@@ -375,52 +755,18 @@ class URLContentExtractor:
     def _clean_twin_names_html(self, soup: BeautifulSoup) -> str:
         """清理twin names格式的HTML"""
         try:
-            allowed_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'strong', 'b', 'em', 'i', 'u', 'ul', 'ol', 'li', 'blockquote', 'div', 'span']
-            
-            # 递归清理函数，专门处理twin names格式
-            def clean_twin_names_element(elem):
-                if elem.name is None:  # 文本节点
-                    return str(elem).strip()
-                
-                if elem.name in allowed_tags:
-                    # 特殊处理：保留标题和列表结构
-                    cleaned_children = []
-                    for child in elem.children:
-                        cleaned_child = clean_twin_names_element(child)
-                        if cleaned_child:
-                            cleaned_children.append(cleaned_child)
-                    
-                    if cleaned_children or elem.name in ['br']:
-                        children_html = ''.join(cleaned_children)
-                        if elem.name == 'br':
-                            return '<br>'
-                        elif children_html.strip():
-                            return f"<{elem.name}>{children_html}</{elem.name}>"
-                    return ""
-                else:
-                    # 不允许的标签，提取其内容但保持子元素结构
-                    cleaned_children = []
-                    for child in elem.children:
-                        cleaned_child = clean_twin_names_element(child)
-                        if cleaned_child:
-                            cleaned_children.append(cleaned_child)
-                    return ''.join(cleaned_children)
-            
-            # 清理整个内容，保持twin names结构
+            # 清理整个内容，保持twin names结构（标题和列表）
             cleaned_parts = []
             for child in soup.children:
-                cleaned_child = clean_twin_names_element(child)
+                cleaned_child = self._clean_element(child, strip_text=True)
                 if cleaned_child and cleaned_child.strip():
                     cleaned_parts.append(cleaned_child.strip())
             
             # 合并内容
             cleaned_html = '\n\n'.join(cleaned_parts)
             
-            # Twin names格式特定的清理
-            cleaned_html = re.sub(r'<p>\s*</p>', '', cleaned_html)  # 移除空段落
-            cleaned_html = re.sub(r'<li>\s*</li>', '', cleaned_html)  # 移除空列表项
-            cleaned_html = re.sub(r'<ul>\s*</ul>', '', cleaned_html)  # 移除空列表
-            cleaned_html = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned_html)  # 规范化换行
+            # 清理函数不会产生空标签，只需规范化换行
+            cleaned_html = _MULTI_NL_RE.sub('\n\n', cleaned_html)  # 规范化换行
             
             logger.info(f"已应用twin names格式清理，内容长度: {len(cleaned_html)}")
             return cleaned_html.strip()
@@ -432,87 +778,24 @@ class URLContentExtractor:
     def _clean_traditional_structured_html(self, soup: BeautifulSoup) -> str:
         """清理传统结构化HTML格式"""
         try:
-            allowed_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'strong', 'b', 'em', 'i', 'u', 'ul', 'ol', 'li', 'blockquote', 'div', 'span']
-            
-            # 递归清理函数，保留结构化内容的完整性
-            def clean_structured_element(elem):
-                if elem.name is None:  # 文本节点
-                    return str(elem).strip()
-                
-                if elem.name in allowed_tags:
-                    # 特殊处理：保留名字和详细信息的结构
-                    cleaned_children = []
-                    for child in elem.children:
-                        cleaned_child = clean_structured_element(child)
-                        if cleaned_child:
-                            cleaned_children.append(cleaned_child)
-                    
-                    if cleaned_children or elem.name in ['br']:
-                        children_html = ''.join(cleaned_children)
-                        if elem.name == 'br':
-                            return '<br>'
-                        elif children_html.strip():
-                            # 保留元素的属性（如果需要）
-                            return f"<{elem.name}>{children_html}</{elem.name}>"
-                    return ""
-                else:
-                    # 不允许的标签，提取其内容但保持子元素结构
-                    cleaned_children = []
-                    for child in elem.children:
-                        cleaned_child = clean_structured_element(child)
-                        if cleaned_child:
-                            cleaned_children.append(cleaned_child)
-                    return ''.join(cleaned_children)
-            
-            # 清理整个内容，保持结构
+            # 清理整个内容，保持结构；写入文本时顺带在标签后补充空格，改善可读性
             cleaned_parts = []
             for child in soup.children:
-                cleaned_child = clean_structured_element(child)
+                cleaned_child = self._clean_element(child, strip_text=True, format_spacing=True)
                 if cleaned_child and cleaned_child.strip():
                     cleaned_parts.append(cleaned_child.strip())
             
-            # 合并内容
+            # 合并内容（清理时不会产生空标签，只需规范化换行）
             cleaned_html = '\n\n'.join(cleaned_parts)
+            cleaned_html = _MULTI_NL_RE.sub('\n\n', cleaned_html)  # 规范化换行
             
-            # 轻量级清理，不破坏结构
-            cleaned_html = re.sub(r'<p>\s*</p>', '', cleaned_html)  # 移除空段落
-            cleaned_html = re.sub(r'<li>\s*</li>', '', cleaned_html)  # 移除空列表项
-            cleaned_html = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned_html)  # 规范化换行
-            
-            # 在冒号后面添加空格，改善可读性
-            cleaned_html = self._format_structured_spacing(cleaned_html)
-            
+            logger.info("已应用结构化内容空格格式化")
             return cleaned_html.strip()
             
         except Exception as e:
             logger.error(f"清理传统结构化HTML时发生错误: {e}")
             return str(soup)
     
-    def _format_structured_spacing(self, content: str) -> str:
-        """
-        为结构化内容添加适当的空格，改善可读性
-        """
-        try:
-            # 在span标签后面的冒号和内容之间添加空格
-            # 匹配模式: </span>直接跟着文本内容
-            # 例如: </span>English -> </span> English
-            content = re.sub(r'</span>([A-Za-z])', r'</span> \1', content)
-            
-            # 在About:, Origin:, Meaning:, Popularity: 等标签后添加空格
-            # 如果冒号后面直接跟着文字，添加空格
-            content = re.sub(r':</span>([A-Za-z])', r':</span> \1', content)
-            
-            # 处理其他可能的冒号情况
-            # 匹配 >: 后直接跟字母的情况
-            content = re.sub(r'>:([A-Za-z])', r'>: \1', content)
-            
-            logger.info("已应用结构化内容空格格式化")
-            return content
-            
-        except Exception as e:
-            logger.error(f"格式化结构化内容空格时发生错误: {e}")
-            return content
-    
     def _truncate_content(self, content: str) -> str:
         """
         根据配置的关键词截断内容
@@ -527,13 +810,12 @@ class URLContentExtractor:
             # 检查是否包含截断关键词
             truncation_keywords = self.config.TRUNCATION_KEYWORDS
             
+            # 不区分大小写地查找关键词，全文只转换一次小写
+            content_lower = content.lower()
+            
             for keyword in truncation_keywords:
-                # 不区分大小写地查找关键词
-                keyword_lower = keyword.lower()
-                content_lower = content.lower()
-                
                 # 查找关键词位置
-                keyword_pos = content_lower.find(keyword_lower)
+                keyword_pos = content_lower.find(keyword.lower())
                 if keyword_pos != -1:
                     logger.info(f"找到截断关键词 '{keyword}' 在位置 {keyword_pos}")
                     
@@ -564,13 +846,26 @@ class URLContentExtractor:
             清理后的内容
         """
         try:
-            from bs4 import BeautifulSoup
-            
-            # 解析HTML并自动修复不完整的标签
-            soup = BeautifulSoup(content, 'html.parser')
+            # 截断只会在末尾留下未闭合的标签：单次扫描维护标签栈，再按栈逆序补上结束标签，
+            # 无需重新解析和序列化整段内容
+            content = _PARTIAL_TAG_RE.sub('', content)  # 去掉末尾被截断的不完整标签
+            
+            open_tags = []
+            for match in _TAG_TOKEN_RE.finditer(content):
+                name = match.group(2)
+                if name is None:  # 注释
+                    continue
+                name = name.lower()
+                if name in VOID_TAGS or match.group(3):
+                    continue
+                if not match.group(1):
+                    open_tags.append(name)
+                elif name in open_tags:
+                    # 结束标签关闭最近的同名标签，其间未闭合的标签一并视为已关闭
+                    while open_tags.pop() != name:
+                        pass
             
-            # 返回修复后的HTML
-            return str(soup)
+            return content + ''.join(f"</{name}>" for name in reversed(open_tags))
             
         except Exception as e:
             logger.error(f"清理截断HTML时发生错误: {e}")
@@ -587,13 +882,13 @@ class URLContentExtractor:
             
             # 检查是否是传统的名字列表格式，先分离出独立的名字条目
             # 按大写字母分割文本，每个大写字母开头的部分可能是一个名字条目
-            parts = re.split(r'(?=[A-Z][a-z]+[A-Z])', text)
+            parts = _NAME_ENTRY_SPLIT_RE.split(text)
             
             # 过滤出看起来像名字条目的部分
             name_entries = []
             for part in parts:
                 part = part.strip()
-                if len(part) > 10 and re.match(r'^[A-Z][a-z]+[A-Z]', part):
+                if len(part) > 10 and _NAME_ENTRY_START_RE.match(part):
                     name_entries.append(part)
             
             if len(name_entries) > 3:  # 如果找到多个名字条目
@@ -601,7 +896,7 @@ class URLContentExtractor:
                 formatted_parts = []
                 for entry in name_entries:
                     # 提取名字（第一个单词）
-                    match = re.match(r'^([A-Z][a-z]+)(.*)$', entry)
+                    match = _NAME_AND_DESCRIPTION_RE.match(entry)
                     if match:
                         name = match.group(1)
                         description = match.group(2).strip()
@@ -616,7 +911,7 @@ class URLContentExtractor:
                     return '\n\n'.join(formatted_parts)
             else:
                 # 普通文本，尝试按句子分段
-                sentences = re.split(r'[.!?]+\s+', text)
+                sentences = _SENTENCE_SPLIT_RE.split(text)
                 if len(sentences) > 3:
                     # 每2-3句组成一段
                     paragraphs = []
@@ -654,12 +949,20 @@ class URLContentExtractor:
         """
         try:
             # 检查文本中是否包含典型的名字列表特征
-            origin_count = text.count('Origin:')
-            meaning_count = text.count('Meaning:')
+            # 大多数页面不包含这些关键词：先用in判断最少见的Popularity:，找不到即可返回，
+            # 不必对全文做三次完整的count扫描
+            if 'Popularity:' not in text:
+                return False
             popularity_count = text.count('Popularity:')
+            if popularity_count < 3:
+                return False
+            meaning_count = text.count('Meaning:')
+            if meaning_count < 3:
+                return False
+            origin_count = text.count('Origin:')
             
             # 如果这些关键词都出现多次，且数量相近，则认为是标准化名字列表
-            if origin_count >= 3 and meaning_count >= 3 and popularity_count >= 3:
+            if origin_count >= 3:
                 # 检查数量是否相近（允许一定的差异）
                 counts = [origin_count, meaning_count, popularity_count]
                 max_count = max(counts)
@@ -683,10 +986,8 @@ class URLContentExtractor:
         try:
             formatted_parts = []
             
-            # 更精确的正则表达式匹配模式
             # 匹配：名字 Origin: xxx Meaning: xxx Popularity: xxx 直到下一个名字或结束
-            name_pattern = r'([A-Z][a-z]+(?:[A-Z][a-z]+)*)\s*Origin:\s*([^M]+?)Meaning:\s*([^P]+?)Popularity:\s*([^A-Z]+?)(?=\s*[A-Z][a-z]+Origin:|$)'
-            matches = re.finditer(name_pattern, text, re.MULTILINE | re.DOTALL)
+            matches = self._iter_name_blocks(text)
             
             for match in matches:
                 name = match.group(1).strip()
@@ -695,21 +996,14 @@ class URLContentExtractor:
                 popularity = match.group(4).strip()
                 
                 # 清理各字段
-                origin = re.sub(r'[^\w\s,.-]', '', origin).strip()
-                meaning = re.sub(r'[*_]', '', meaning).strip()
-                popularity = re.sub(r'[^\w\s#>]', '', popularity).strip()
+                origin = _ORIGIN_CLEAN_RE.sub('', origin).strip()
+                meaning = _ITALIC_MARK_RE.sub('', meaning).strip()
+                popularity = _POPULARITY_CLEAN_RE.sub('', popularity).strip()
                 
                 # 确保字段不为空
                 if name and origin and meaning and popularity:
                     # 格式化每个名字为HTML结构
-                    formatted_name = f"<h3>{name}</h3>\n"
-                    formatted_name += f"<ul>\n"
-                    formatted_name += f"<li><strong>Origin:</strong> {origin}</li>\n"
-                    formatted_name += f"<li><strong>Meaning:</strong> <em>{meaning}</em></li>\n"
-                    formatted_name += f"<li><strong>Popularity:</strong> {popularity}</li>\n"
-                    formatted_name += f"</ul>"
-                    
-                    formatted_parts.append(formatted_name)
+                    formatted_parts.append(self._format_name_entry(name, origin, meaning, popularity))
             
             if formatted_parts:
                 logger.info(f"成功格式化 {len(formatted_parts)} 个标准化名字条目")
@@ -723,6 +1017,63 @@ class URLContentExtractor:
             logger.error(f"格式化标准化名字列表时发生错误: {e}")
             return f"<p>{text}</p>"
     
+    def _iter_name_blocks(self, text: str):
+        """
+        逐个返回_NAME_BLOCK_RE的匹配，结果与finditer完全一致
+        
+        直接对整段文本finditer时，正则会在每个大写字母处尝试匹配：连续的驼峰单词
+        会被反复回溯，且每次尝试都要向后扫描到下一个"M"，遇到不规范的页面会退化为平方级。
+        这里先用str.find定位每个"Origin:"，名字只可能是紧挨在它前面的驼峰单词链，
+        因此每个"Origin:"只需在链的最左起点尝试一次匹配。
+        """
+        pos = 0
+        while True:
+            origin_pos = text.find('Origin:', pos)
+            if origin_pos == -1:
+                return
+            
+            # Origin:之后遇到的第一个"M"必须是Meaning:的开头，否则不可能匹配
+            meaning_pos = text.find('M', origin_pos + 7)
+            if meaning_pos == -1:
+                return
+            if not text.startswith('Meaning:', meaning_pos):
+                pos = origin_pos + 1
+                continue
+            
+            # 跳过名字和Origin:之间的空白，再向前找出由[A-Z][a-z]+组成的单词链的最左起点
+            end = origin_pos
+            while end > pos and text[end - 1].isspace():
+                end -= 1
+            start = None
+            i = end
+            while True:
+                j = i
+                while j > pos and 'a' <= text[j - 1] <= 'z':
+                    j -= 1
+                if j == i or j == pos or not 'A' <= text[j - 1] <= 'Z':
+                    break
+                start = i = j - 1
+                if i <= pos:
+                    break
+            
+            match = _NAME_BLOCK_RE.match(text, start) if start is not None else None
+            if match:
+                yield match
+                pos = match.end()
+            else:
+                pos = origin_pos + 1
+    
+    def _format_name_entry(self, name: str, origin: str, meaning: str, popularity: str) -> str:
+        """将单个名字条目格式化为h3标题加详情列表，一次性拼接避免逐行累加字符串"""
+        return ''.join((
+            f"<h3>{name}</h3>\n",
+            "<ul>\n",
+            f"<li><strong>Origin:</strong> {origin}</li>\n",
+            f"<li><strong>Meaning:</strong> <em>{meaning}</em></li>\n",
+            f"<li><strong>Popularity:</strong> {popularity}</li>\n",
+            "</ul>"
+        ))
+    
     def _fallback_structured_format(self, text: str) -> str:
         """
         备用的标准化格式处理方法
@@ -743,13 +1094,7 @@ class URLContentExtractor:
                 # 尝试从这部分提取名字信息
                 name_info = self._extract_name_from_part(part)
                 if name_info:
-                    formatted_name = f"<h3>{name_info['name']}</h3>\n"
-                    formatted_name += f"<ul>\n"
-                    formatted_name += f"<li><strong>Origin:</strong> {name_info['origin']}</li>\n"
-                    formatted_name += f"<li><strong>Meaning:</strong> <em>{name_info['meaning']}</em></li>\n"
-                    formatted_name += f"<li><strong>Popularity:</strong> {name_info['popularity']}</li>\n"
-                    formatted_name += f"</ul>"
-                    formatted_parts.append(formatted_name)
+                    formatted_parts.append(self._format_name_entry(**name_info))
             
             if formatted_parts:
                 logger.info(f"备用方法成功格式化 {len(formatted_parts)} 个名字条目")
@@ -768,23 +1113,23 @@ class URLContentExtractor:
         """
         try:
             # 在前面寻找名字（Origin:之前的大写字母开头的单词）
-            name_match = re.search(r'([A-Z][a-z]+(?:[A-Z][a-z]+)*)\s*Origin:', part)
+            name_match = _NAME_BEFORE_ORIGIN_RE.search(part)
             if not name_match:
                 return None
                 
             name = name_match.group(1).strip()
             
             # 提取Origin
-            origin_match = re.search(r'Origin:\s*([^M]*?)(?=Meaning:|$)', part)
+            origin_match = _ORIGIN_FIELD_RE.search(part)
             origin = origin_match.group(1).strip() if origin_match else ""
             
             # 提取Meaning  
-            meaning_match = re.search(r'Meaning:\s*([^P]*?)(?=Popularity:|$)', part)
+            meaning_match = _MEANING_FIELD_RE.search(part)
             meaning = meaning_match.group(1).strip() if meaning_match else ""
-            meaning = re.sub(r'[*_]', '', meaning)  # 清理斜体标记
+            meaning = _ITALIC_MARK_RE.sub('', meaning)  # 清理斜体标记
             
             # 提取Popularity
-            popularity_match = re.search(r'Popularity:\s*([^A-Z]*?)(?=[A-Z][a-z]*Origin:|$)', part)
+            popularity_match = _POPULARITY_FIELD_RE.search(part)
             popularity = popularity_match.group(1).strip() if popularity_match else ""
             
             # 清理字段
@@ -817,6 +1162,12 @@ class URLContentExtractor:
         Returns:
             格式化后的HTML内容，如果失败返回None
         """
+        cache_key = (url, start_keyword)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"使用缓存的提取结果: {url}")
+            return cached
+        
         result = self.extract_content(url)
         if not result:
             return None
@@ -825,7 +1176,7 @@ class URLContentExtractor:
         
         # 如果指定了起始关键词，从该关键词开始截取内容
         if start_keyword:
-            content = self._extract_from_keyword(content, start_keyword)
+            content = self._extract_from_keyword(_parse_fragment(content), start_keyword)
             if not content:
                 logger.warning(f"未找到关键词 '{start_keyword}'，使用完整内容")
                 content = result['content']
@@ -837,87 +1188,102 @@ class URLContentExtractor:
         formatted_content = content
         
         # 不添加来源信息，直接返回内容
+        self._cache.set(cache_key, formatted_content)
         return formatted_content
     
-    def _extract_from_keyword(self, content: str, keyword: str) -> str:
+    def extract_many(self, urls: List[str], start_keyword: str = None, max_workers: int = 16) -> List[Optional[str]]:
+        """
+        并发提取多个URL的内容，所有线程共享同一个带连接池的session
+        
+        Args:
+            urls: 要提取内容的URL列表
+            start_keyword: 可选的起始关键词，应用于每个URL
+            max_workers: 最大并发线程数，不应超过连接池大小
+            
+        Returns:
+            与urls顺序一致的格式化HTML内容列表，失败的URL对应None
+        """
+        with self._executor(max_workers) as executor:
+            return list(executor.map(lambda url: self.extract_and_format(url, start_keyword), urls))
+    
+    def extract_contents(self, urls: List[str], max_workers: int = 16) -> List[Optional[Dict[str, Any]]]:
+        """
+        并发提取多个URL的原始内容（标题、清理后的正文等），不做关键词截取和格式化
+        
+        Args:
+            urls: 要提取内容的URL列表
+            max_workers: 最大并发线程数，不应超过连接池大小
+            
+        Returns:
+            与urls顺序一致的extract_content结果列表，失败的URL对应None
+        """
+        with self._executor(max_workers) as executor:
+            return list(executor.map(self.extract_content, urls))
+    
+    def _executor(self, max_workers: int) -> ThreadPoolExecutor:
+        """创建线程池，线程数不超过连接池大小，避免线程等待空闲连接"""
+        return ThreadPoolExecutor(max_workers=_worker_limit(self.config, max_workers))
+    
+    def _extract_from_keyword(self, soup: BeautifulSoup, keyword: str) -> str:
         """
         从指定关键词开始提取内容，保留HTML格式
         
         Args:
-            content: 原始HTML内容
+            soup: 已解析的清理后HTML片段（由调用方解析一次后传入）
             keyword: 起始关键词
             
         Returns:
             从关键词开始的内容，保留原始HTML格式
         """
         try:
-            from bs4 import BeautifulSoup
-            
-            # 解析HTML内容
-            soup = BeautifulSoup(content, 'html.parser')
+            # 查找包含关键词的元素
+            # 后代元素的文本总是祖先元素文本的子串，因此文档顺序中第一个包含关键词的元素
+            # 必然是顶级子节点，它的父容器也就是顶级容器本身
+            all_elements = list(soup.children)
             
-            # 检查是否是结构化HTML格式
-            is_structured = self._is_structured_html_format(soup)
+            # 每个顶级子节点只计算一次文本，拼接后用一次find扫描，
+            # 再按各段起始偏移二分定位到所在的子节点
+            texts = [child.get_text() if hasattr(child, 'get_text') else '' for child in all_elements]
+            doc_text = ''.join(texts)
+            offsets = [0, *accumulate(map(len, texts))]
             
-            # 查找包含关键词的元素
             keyword_element = None
-            
-            # 遍历所有元素，查找包含关键词的元素
-            for element in soup.find_all():
-                element_text = element.get_text()
-                if keyword in element_text:
-                    keyword_element = element
-                    logger.info(f"在 {element.name} 元素中找到关键词 '{keyword}'")
+            keyword_index = -1
+            pos = doc_text.find(keyword)
+            while pos != -1:
+                i = bisect_right(offsets, pos) - 1
+                if pos + len(keyword) > offsets[i + 1]:
+                    # 跨越多个子节点的匹配不属于任何单个元素
+                    pos = doc_text.find(keyword, pos + 1)
+                    continue
+                
+                if keyword_index == -1:
+                    keyword_index = i
+                    keyword_text = texts[i]
+                if all_elements[i].name:
+                    keyword_element = all_elements[i]
+                    logger.info(f"在 {keyword_element.name} 元素中找到关键词 '{keyword}'")
                     break
+                pos = doc_text.find(keyword, offsets[i + 1])
             
             if not keyword_element:
                 logger.warning(f"未找到关键词 '{keyword}'")
                 return ""
             
-            if is_structured:
+            # 找到关键词后再检查是否是结构化HTML格式
+            if self._is_structured_html_format(soup):
                 # 对于结构化HTML，从关键词元素开始收集结构化内容
                 return self._extract_structured_from_keyword(soup, keyword_element, keyword)
             
-            # 获取关键词元素的父容器
-            container = keyword_element.parent
-            while container and container.name in ['span', 'strong', 'em', 'b', 'i']:
-                container = container.parent
-            
-            if not container:
-                container = soup
-            
-            # 获取容器中的所有子元素
-            all_elements = list(container.children)
-            
-            # 找到包含关键词的元素在容器中的位置
-            keyword_index = -1
-            for i, child in enumerate(all_elements):
-                if hasattr(child, 'get_text') and keyword in child.get_text():
-                    keyword_index = i
-                    break
-            
-            if keyword_index == -1:
-                logger.warning(f"无法在容器中定位关键词元素")
-                return ""
-            
             # 从关键词元素开始收集所有后续内容
             collected_elements = []
             
-            # 处理包含关键词的元素
-            keyword_elem = all_elements[keyword_index]
-            if hasattr(keyword_elem, 'get_text'):
-                elem_text = keyword_elem.get_text()
-                keyword_pos = elem_text.find(keyword)
-                
-                if keyword_pos >= 0:
-                    # 获取从关键词开始的文本
-                    from_keyword_text = elem_text[keyword_pos:]
-                    
-                    # 对从关键词开始的文本进行智能分段
-                    formatted_text = self._smart_paragraph_split(from_keyword_text)
-                    collected_elements.append(formatted_text)
-                else:
-                    collected_elements.append(str(keyword_elem))
+            # 处理包含关键词的元素：复用定位时得到的文本，partition一次扫描即可切出关键词之后的部分
+            _, _, after_keyword = keyword_text.partition(keyword)
+            
+            # 对从关键词开始的文本进行智能分段
+            formatted_text = self._smart_paragraph_split(keyword + after_keyword)
+            collected_elements.append(formatted_text)
             
             # 收集关键词元素之后的所有元素
             for i in range(keyword_index + 1, len(all_elements)):
@@ -935,8 +1301,8 @@ class URLContentExtractor:
             result_content = '\n\n'.join(collected_elements)
             
             # 清理格式
-            result_content = re.sub(r'\n\s*\n\s*\n+', '\n\n', result_content)
-            result_content = re.sub(r'<p>\s*</p>', '', result_content)
+            result_content = _MULTI_NL_RE.sub('\n\n', result_content)
+            result_content = _EMPTY_P_RE.sub('', result_content)
             
             logger.info(f"从关键词 '{keyword}' 开始提取了 {len(result_content)} 字符的内容")
             
@@ -970,17 +1336,19 @@ class URLContentExtractor:
             # 在twin names格式中，关键词可能在标题或列表项中
             target_element = None
             
-            # 首先检查是否在标题中
-            for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                if keyword.lower() in heading.get_text().lower():
+            keyword_lower = keyword.lower()
+            
+            # 首先检查是否在标题中（惰性遍历，找到即停止，不构建完整的标题列表）
+            for heading in (elem for elem in soup.descendants if elem.name in HEADING_TAGS):
+                if keyword_lower in heading.get_text().lower():
                     target_element = heading
                     logger.info(f"找到包含关键词 '{keyword}' 的标题元素: {heading.name}")
                     break
             
             # 如果不在标题中，检查列表项
             if not target_element:
-                for li in soup.find_all('li'):
-                    if keyword.lower() in li.get_text().lower():
+                for li in (elem for elem in soup.descendants if elem.name == 'li'):
+                    if keyword_lower in li.get_text().lower():
                         # 找到包含此列表项的ul元素
                         target_element = li.find_parent('ul')
                         if target_element:
@@ -991,40 +1359,20 @@ class URLContentExtractor:
                 logger.warning(f"未找到包含关键词 '{keyword}' 的twin names元素")
                 return ""
             
-            # 获取整个文档的所有顶级元素（按顺序）
-            all_elements = []
-            for elem in soup.descendants:
-                # 收集顶级的内容元素
-                if (elem.name in ['p', 'ul', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'] and 
-                    elem.parent and elem.parent.name in ['div', 'body', '[document]', 'article', 'main', 'section']):
-                    all_elements.append(elem)
-            
-            # 找到目标元素在列表中的位置
-            start_index = -1
-            for i, elem in enumerate(all_elements):
-                if elem == target_element:
-                    start_index = i
-                    logger.info(f"找到twin names目标元素在索引 {i} 位置")
-                    break
-            
-            if start_index == -1:
+            # 目标元素本身必须是顶级元素：直接检查它的父元素，
+            # 不再在所有顶级元素中逐个做比较整棵子树的相等判断
+            if target_element.parent.name not in _TWIN_NAMES_PARENT_TAGS:
                 logger.warning("无法定位twin names目标元素在文档中的位置")
                 return ""
             
-            # 从目标元素开始收集所有后续的内容
-            collected_elements = []
-            
-            for i in range(start_index, len(all_elements)):
-                elem = all_elements[i]
-                # 保留完整的HTML结构
-                collected_elements.append(str(elem))
-            
-            # 合并所有元素
-            result_content = '\n\n'.join(collected_elements)
+            # 从目标元素开始单次遍历收集所有后续的顶级元素，逐个直接decode()后合并，
+            # 不经过str()转发，也不保留中间的字符串列表
+            blocks = _top_level_blocks(target_element, _TWIN_NAMES_PARENT_TAGS)
+            result_content = '\n\n'.join(elem.decode() for elem in blocks)
             
             # Twin names格式特定的清理
-            result_content = re.sub(r'\n\s*\n\s*\n+', '\n\n', result_content)
-            result_content = re.sub(r'<ul>\s*</ul>', '', result_content)  # 移除空列表
+            result_content = _MULTI_NL_RE.sub('\n\n', result_content)
+            result_content = _EMPTY_UL_RE.sub('', result_content)  # 移除空列表
             
             logger.info(f"从twin names关键词 '{keyword}' 开始提取了 {len(result_content)} 字符的内容")
             return result_content.strip()
@@ -1033,6 +1381,25 @@ class URLContentExtractor:
             logger.error(f"从twin names内容提取关键词时发生错误: {e}")
             return ""
     
+    def _find_strong_keyword_paragraph(self, soup: BeautifulSoup, keyword: str) -> Optional[Tag]:
+        """
+        查找文档中第一个首个<strong>包含关键词的<p>
+        
+        直接按文档顺序检查<strong>，不再对每个<p>向下查找<strong>（没有<strong>的段落要遍历整个子树）。
+        第一个满足条件的<strong>所在的最外层满足条件的<p>即为结果：更早开始的<p>若满足条件，
+        其首个<strong>必然更早出现
+        """
+        # 惰性遍历，找到即停止，不构建完整的<strong>列表
+        for strong_elem in (elem for elem in soup.descendants if elem.name == 'strong'):
+            if keyword not in _element_text(strong_elem):
+                continue
+            # 从最外层的<p>开始，找到以该<strong>作为首个<strong>的段落
+            paragraphs = [parent for parent in strong_elem.parents if parent.name == 'p']
+            for p_elem in reversed(paragraphs):
+                if p_elem.find('strong') is strong_elem:
+                    return p_elem
+        return None
+    
     def _extract_traditional_from_keyword(self, soup: BeautifulSoup, keyword_element, keyword: str) -> str:
         """从传统结构化格式中提取从关键词开始的内容"""
         try:
@@ -1040,51 +1407,27 @@ class URLContentExtractor:
             target_element = None
             
             # 在传统结构化格式中，关键词通常在 <p><strong>关键词</strong></p> 中
-            # 我们需要找到这个确切的<p>元素
-            for p_elem in soup.find_all('p'):
-                strong_elem = p_elem.find('strong')
-                if strong_elem and keyword in strong_elem.get_text():
-                    target_element = p_elem
-                    logger.info(f"找到包含关键词 '{keyword}' 的名字元素: <p><strong>{keyword}</strong></p>")
-                    break
+            # 我们需要找到这个确切的<p>元素：文档中第一个"首个<strong>包含关键词"的<p>
+            target_element = self._find_strong_keyword_paragraph(soup, keyword)
+            if target_element:
+                logger.info(f"找到包含关键词 '{keyword}' 的名字元素: <p><strong>{keyword}</strong></p>")
             
             if not target_element:
                 logger.warning(f"未找到包含关键词 '{keyword}' 的名字元素")
                 return ""
             
-            # 获取整个文档的所有顶级元素（按顺序）
-            all_elements = []
-            for elem in soup.descendants:
-                # 只收集顶级的内容元素，避免重复
-                if (elem.name in ['p', 'ul', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'] and 
-                    elem.parent and elem.parent.name in ['div', 'body', '[document]']):
-                    all_elements.append(elem)
-            
-            # 找到目标元素在列表中的位置
-            start_index = -1
-            for i, elem in enumerate(all_elements):
-                if elem == target_element:
-                    start_index = i
-                    logger.info(f"找到目标元素在索引 {i} 位置")
-                    break
-            
-            if start_index == -1:
+            # 目标元素本身必须是顶级元素，按身份定位，理由同twin names格式
+            if target_element.parent.name not in _TRADITIONAL_PARENT_TAGS:
                 logger.warning("无法定位目标元素在文档中的位置")
                 return ""
             
-            # 从目标元素开始收集所有后续的结构化内容
-            collected_elements = []
-            
-            for i in range(start_index, len(all_elements)):
-                elem = all_elements[i]
-                # 保留完整的HTML结构
-                collected_elements.append(str(elem))
-            
-            # 合并所有元素
-            result_content = '\n\n'.join(collected_elements)
+            # 从目标元素开始单次遍历收集所有后续的结构化内容，逐个直接decode()后合并，
+            # 不经过str()转发，也不保留中间的字符串列表
+            blocks = _top_level_blocks(target_element, _TRADITIONAL_PARENT_TAGS)
+            result_content = '\n\n'.join(elem.decode() for elem in blocks)
             
             # 轻量级清理
-            result_content = re.sub(r'\n\s*\n\s*\n+', '\n\n', result_content)
+            result_content = _MULTI_NL_RE.sub('\n\n', result_content)
             
             logger.info(f"从传统结构化关键词 '{keyword}' 开始提取了 {len(result_content)} 字符的内容")
             return result_content.strip()
@@ -1109,6 +1452,45 @@ def extract_url_content(url: str, start_keyword: str = None) -> Optional[str]:
     return extractor.extract_and_format(url, start_keyword)
 
 
+async def extract_url_content_async(url: str, start_keyword: str = None) -> Optional[str]:
+    """
+    异步便捷函数：从URL提取内容
+    
+    提取在线程池中执行，等待网络时不阻塞事件循环，可与其他协程并发
+    """
+    extractor = URLContentExtractor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, extractor.extract_and_format, url, start_keyword)
+
+
+async def extract_many_async(urls: List[str], start_keyword: str = None, max_workers: int = 16) -> List[Optional[str]]:
+    """
+    异步并发提取多个URL的内容，所有请求共享同一个带连接池的session
+    
+    Returns:
+        与urls顺序一致的格式化HTML内容列表，失败的URL对应None
+    """
+    if not urls:
+        return []
+    
+    extractor = URLContentExtractor()
+    loop = asyncio.get_running_loop()
+    # 用信号量限制同时提交到事件循环默认线程池的任务数，而不是自建线程池：
+    # 协程被取消时不会在事件循环线程上等待排队中的提取全部完成
+    semaphore = asyncio.Semaphore(_worker_limit(extractor.config, max_workers))
+    
+    async def extract(url: str) -> Optional[str]:
+        async with semaphore:
+            return await loop.run_in_executor(None, extractor.extract_and_format, url, start_keyword)
+    
+    results = await asyncio.gather(*(extract(url) for url in urls), return_exceptions=True)
+    
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.error(f"异步提取内容失败 {url}: {result}")
+    return [None if isinstance(result, Exception) else result for result in results]
+
+
 if __name__ == "__main__":
     # 测试功能
     test_url = input("请输入要提取内容的URL: ")
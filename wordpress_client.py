@@ -1,16 +1,26 @@
 import requests
-import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 from config import Config
+from http_utils import TTLCache, mount_pooled_adapter
 import logging
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# REST API查询文章时只请求用到的字段，减少响应体积和JSON解析时间；
+# context=edit使content包含未经过滤的raw（保留区块注释和短代码），更新时写回的正是这份内容；
+# 这需要编辑权限，没有权限时会收到401/403（rest_forbidden_context），此时去掉context=edit重新查询
+POST_FIELDS = 'id,title,slug,content,status,link'
+POST_QUERY_PARAMS = {'_fields': POST_FIELDS, 'context': 'edit'}
+
 class WordPressClient:
     """WordPress客户端类"""
     
+    # 连接测试成功后在整个进程内只做一次
+    _connection_tested = False
+    
     def __init__(self):
         """初始化WordPress客户端"""
         self.config = Config()
@@ -20,9 +30,9 @@ class WordPressClient:
         self.username = self.config.WORDPRESS_USERNAME
         self.password = self.config.WORDPRESS_APP_PASSWORD
         
-        # 初始化XML-RPC客户端
-        self.xmlrpc_url = urljoin(self.base_url, '/xmlrpc.php')
-        self.client = xmlrpc.client.ServerProxy(self.xmlrpc_url)
+        # REST API端点只在初始化时拼接一次，查询参数交给requests编码
+        self._posts_url = urljoin(self.base_url, '/wp-json/wp/v2/posts')
+        self._users_me_url = urljoin(self.base_url, '/wp-json/wp/v2/users/me')
         
         # 初始化REST API会话
         self.session = requests.Session()
@@ -30,13 +40,28 @@ class WordPressClient:
         self.session.headers.update({
             'User-Agent': 'WordPress-Article-Updater/1.0'
         })
+        
+        # 配置连接池和重试，批量更新时复用连接，避免每次调用都重新握手
+        mount_pooled_adapter(self.session, self.config)
+        
+        # 文章缓存：按 ('id', post_id) / ('slug', slug) 缓存，带TTL和LRU淘汰
+        self._post_cache = TTLCache(self.config.POST_CACHE_SIZE, self.config.POST_CACHE_TTL)
+        # 文章ID -> 以slug缓存时使用的slug，更新文章时据此失效对应的slug条目
+        self._post_slugs = {}
     
     def test_connection(self):
         """测试WordPress连接"""
+        if WordPressClient._connection_tested:
+            return True
+        
         try:
-            # 测试XML-RPC连接
-            options = self.client.wp.getOptions(1, self.username, self.password, 'blog_title')
-            logger.info(f"成功连接到WordPress: {options.get('blog_title', 'Unknown')}")
+            # 通过REST API获取当前用户，同时验证连接和应用密码
+            response = self.session.get(self._users_me_url, params={'_fields': 'name'},
+                                        timeout=self.config.API_TIMEOUT)
+            response.raise_for_status()
+            
+            logger.info(f"成功连接到WordPress，当前用户: {response.json().get('name', 'Unknown')}")
+            WordPressClient._connection_tested = True
             return True
         except Exception as e:
             logger.error(f"连接WordPress失败: {e}")
@@ -68,9 +93,16 @@ class WordPressClient:
     
     def get_post_by_id(self, post_id):
         """根据ID获取文章"""
+        cache_key = ('id', post_id)
+        post = self._post_cache.get(cache_key)
+        if post is not None:
+            return post
+        
         try:
-            post = self.client.wp.getPost(1, self.username, self.password, post_id)
-            logger.info(f"成功获取文章: {post.get('post_title', 'Unknown')}")
+            # 使用REST API获取文章
+            post = self._get_post_json(f'{self._posts_url}/{post_id}')
+            logger.info(f"成功获取文章: {post.get('title', {}).get('rendered', 'Unknown')}")
+            self._post_cache.set(cache_key, post)
             return post
         except Exception as e:
             logger.error(f"根据ID获取文章失败: {e}")
@@ -78,16 +110,19 @@ class WordPressClient:
     
     def get_post_by_slug(self, slug):
         """根据slug获取文章"""
+        cache_key = ('slug', slug)
+        post = self._post_cache.get(cache_key)
+        if post is not None:
+            return post
+        
         try:
             # 使用REST API获取文章
-            api_url = urljoin(self.base_url, f'/wp-json/wp/v2/posts?slug={slug}')
-            response = self.session.get(api_url, timeout=self.config.API_TIMEOUT)
-            response.raise_for_status()
-            
-            posts = response.json()
+            posts = self._get_post_json(self._posts_url, {'slug': slug})
             if posts:
                 post = posts[0]
                 logger.info(f"成功获取文章: {post.get('title', {}).get('rendered', 'Unknown')}")
+                self._post_cache.set(cache_key, post)
+                self._post_slugs[post.get('id')] = slug
                 return post
             
             logger.error(f"未找到slug为 '{slug}' 的文章")
@@ -97,41 +132,88 @@ class WordPressClient:
             logger.error(f"根据slug获取文章失败: {e}")
             return None
     
+    def _get_post_json(self, url, params=None):
+        """
+        以context=edit查询文章并返回解析后的JSON
+        
+        用户没有编辑权限时WordPress拒绝context=edit（401/403 rest_forbidden_context），
+        此时去掉该参数重新查询，返回的content只有过滤后的rendered
+        """
+        params = params or {}
+        response = self.session.get(url, params={**params, **POST_QUERY_PARAMS},
+                                    timeout=self.config.API_TIMEOUT)
+        if response.status_code in (401, 403) and self._error_code(response) == 'rest_forbidden_context':
+            logger.warning("当前用户没有编辑权限，无法读取文章原始内容，改为读取渲染后的内容")
+            response = self.session.get(url, params={**params, '_fields': POST_FIELDS},
+                                        timeout=self.config.API_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _error_code(response):
+        """读取REST API错误响应中的code字段，响应不是JSON时返回None"""
+        try:
+            return response.json().get('code')
+        except (ValueError, AttributeError):
+            return None
+    
+    def _invalidate_post(self, post_id):
+        """文章更新后只失效该文章的ID和slug缓存条目，避免之后读到旧内容"""
+        self._post_cache.pop(('id', post_id))
+        slug = self._post_slugs.pop(post_id, None)
+        if slug is not None:
+            self._post_cache.pop(('slug', slug))
+    
     def update_post(self, post_id, content, title=None):
-        """更新文章内容"""
+        """通过REST API更新文章内容（JSON请求体，复用会话连接池）"""
         try:
-            # 准备更新数据
-            post_data = {
-                'post_content': content
-            }
-            
+            post_data = {'content': content}
             if title:
-                post_data['post_title'] = title
+                post_data['title'] = title
             
-            # 使用XML-RPC更新文章
-            result = self.client.wp.editPost(1, self.username, self.password, post_id, post_data)
+            # 更新后只需要确认结果，不让服务器返回整篇文章
+            response = self.session.post(f'{self._posts_url}/{post_id}', params={'_fields': 'id'},
+                                         json=post_data, timeout=self.config.API_TIMEOUT)
+            response.raise_for_status()
+            
+            logger.info(f"成功更新文章 ID: {post_id}")
+            self._invalidate_post(post_id)
+            return True
             
-            if result:
-                logger.info(f"成功更新文章 ID: {post_id}")
-                return True
-            else:
-                logger.error(f"更新文章失败 ID: {post_id}")
-                return False
-                
         except Exception as e:
-            logger.error(f"更新文章时发生错误: {e}")
+            logger.error(f"更新文章时发生错误 ID {post_id}: {e}")
             return False
     
+    def update_posts(self, updates, max_workers=8):
+        """
+        并发批量更新文章
+        
+        Args:
+            updates: (post_id, content) 或 (post_id, content, title) 元组的可迭代对象
+            max_workers: 并发更新的最大线程数
+            
+        Returns:
+            与输入顺序一致的更新结果列表（True/False）
+        """
+        updates = list(updates)
+        if not updates:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(updates))) as executor:
+            return list(executor.map(lambda update: self.update_post(*update), updates))
+    
     def get_post_content(self, post):
         """从文章对象中提取内容"""
         if isinstance(post, dict):
-            # 检查是否是REST API返回的格式
-            if 'content' in post and isinstance(post['content'], dict):
-                # REST API返回的格式
-                return post.get('content', {}).get('rendered', '')
-            else:
-                # XML-RPC返回的格式
-                return post.get('post_content', '')
+            # 只查找一次content键：REST API返回的格式中它是字典，
+            # 优先使用原始内容raw；没有编辑权限时查询去掉了context=edit，只能回退到过滤后的rendered
+            content = post.get('content')
+            if isinstance(content, dict):
+                raw = content.get('raw')
+                if raw is not None:
+                    return raw
+                return content.get('rendered', '')
+            return post.get('post_content', '')
         else:
             # 其他格式
             return post.get('content', {}).get('rendered', '')